@@ -9,13 +9,23 @@ except ImportError:
     __version__ = "dev"
 import os
 
-from .routes import setup_route_handlers, ALLOW_UNAUTH_LOCALHOST_SETTING
-
 # Env var to opt in to token-free localhost ingest (secure by default: off).
 # Mirrors jupyter_server's own JUPYTER_SERVER_ALLOW_UNAUTHENTICATED_ACCESS idiom.
 _ALLOW_UNAUTH_LOCALHOST_ENV = "JUPYTERLAB_NOTIFICATIONS_ALLOW_UNAUTHENTICATED_LOCALHOST"
 
 
+def __getattr__(name):
+    """Lazily re-export the server-side API from .routes.
+
+    routes pulls in jupyter_server and tornado; importing it eagerly would
+    charge that cost to every `jupyterlab-notify` run, which only needs cli.
+    """
+    if name in ("setup_route_handlers", "ALLOW_UNAUTH_LOCALHOST_SETTING"):
+        from . import routes
+        return getattr(routes, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def _jupyter_labextension_paths():
     return [{
         "src": "labextension",
@@ -37,6 +47,8 @@ def _load_jupyter_server_extension(server_app):
     server_app: jupyterlab.labapp.LabApp
         JupyterLab application instance
     """
+    from .routes import setup_route_handlers, ALLOW_UNAUTH_LOCALHOST_SETTING
+
     setup_route_handlers(server_app.web_app)
 
     # Opt-in, secure by default: token-free localhost ingest is only allowed
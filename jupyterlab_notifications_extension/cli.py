@@ -17,25 +17,118 @@ Usage:
     jupyterlab-notify --url "http://remote-server:8888" -m "Test" --token "your-token"
 """
 
-import argparse
+import collections
+import functools
+import http.client
+import io
 import json
 import os
-import subprocess
-import urllib.request
+import sys
+import time
 import urllib.error
 from urllib.parse import urlparse
 
+# Optional C-accelerated JSON encoder (pip install orjson); both produce
+# compact bytes (no whitespace after separators, matching orjson's output)
+try:
+    import orjson
+    _dumps = orjson.dumps
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+# Idle keep-alive connections keyed by (scheme, host, port). A connection is
+# checked out for the duration of one request and handed back afterwards, so
+# repeated notifications to the same server reuse one socket (no TCP/TLS
+# handshake per call) and concurrent callers never share a connection.
+_idle_connections = {}
+
+# Idle connections kept per server. A burst of threads can open more than
+# this; the surplus is closed on check-in instead of holding sockets open.
+_MAX_IDLE_PER_HOST = 10
+
+# Socket timeout in seconds for connecting and for each read, so an
+# unresponsive server fails the send instead of hanging the caller
+_TIMEOUT = 10
+
+# Request bodies larger than this are sent gzip-compressed (fastest level:
+# text-heavy JSON still shrinks several-fold for negligible CPU), but only
+# to endpoints in _gzip_endpoints
+_GZIP_MIN_BYTES = 1024
+
+# Endpoints whose responses advertised "Accept-Encoding: gzip" (RFC 7694).
+# Released servers without gzip support fail a compressed body with a 500,
+# so nothing is compressed until the server has said it can decompress.
+_gzip_endpoints = set()
+
+# Statuses retried with exponential backoff (0.2s, 0.4s, 0.8s). Only 503
+# (service unavailable: the request was not processed) - ingest is not
+# idempotent, and after a 502/504 the server may already have stored the
+# notification, so a retry could show it twice.
+_RETRY_STATUSES = frozenset((503,))
+_MAX_RETRIES = 3
+_RETRY_BACKOFF = 0.2
+
+# Seconds an auto-detected base URL stays valid in the on-disk cache, so
+# back-to-back invocations skip the running-server lookup. Kept
+# short because a restarted server may come back on another port.
+_BASE_URL_CACHE_TTL = 60
+
+# Environment variables consulted for an auth token, in priority order
+_TOKEN_ENV_VARS = ('JUPYTERHUB_API_TOKEN', 'JPY_API_TOKEN', 'JUPYTER_TOKEN')
+
+# Hostnames treated as loopback when deciding whether to attach a local token
+_LOOPBACK_HOSTS = frozenset(('127.0.0.1', 'localhost', '::1'))
+
+
+def _scan_runtime_dir():
+    """
+    Read running-server info straight from the Jupyter runtime directory.
 
-def get_jupyter_base_url():
+    Same data `jupyter server list` prints (the jpserver-*.json files of
+    live server processes), without spawning a second Python interpreter.
+    Returns the first server's info dict or None; raises ImportError when
+    jupyter_server is not importable from this environment.
     """
-    Auto-detect JupyterLab base URL.
+    from jupyter_core.paths import jupyter_runtime_dir
+    from jupyter_server.utils import check_pid
 
-    Checks in order:
-    1. jupyter server list --json - query running servers (uses localhost)
-    2. JUPYTERHUB_SERVICE_PREFIX - JupyterHub environment variable
-    3. Default: http://localhost:8888
+    runtime_dir = jupyter_runtime_dir()
+    if not os.path.isdir(runtime_dir):
+        return None
+
+    for file_name in os.listdir(runtime_dir):
+        if not (file_name.startswith('jpserver-') and file_name.endswith('.json')):
+            continue
+        try:
+            with open(os.path.join(runtime_dir, file_name), encoding='utf-8') as f:
+                info = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            continue  # Removed or still being written by its server
+        # Skip info files left behind by servers that are no longer running
+        if 'pid' in info and check_pid(info['pid']):
+            return info
+    return None
+
+
+@functools.lru_cache(maxsize=1)
+def _running_server_info():
+    """
+    Info dict of the first running Jupyter server, or None.
+
+    Shared by URL and token detection and cached for the process, so one
+    invocation looks up running servers at most once. Scans the runtime
+    directory in-process; falls back to `jupyter server list` only when
+    jupyter_server lives in a different environment than this CLI.
     """
-    # Try to detect from running Jupyter servers (preferred - always uses localhost)
+    try:
+        return _scan_runtime_dir()
+    except ImportError:
+        pass
+
+    import subprocess  # only needed for the fallback, not an explicit --url
+
     try:
         result = subprocess.run(
             ['jupyter', 'server', 'list', '--json'],
@@ -46,12 +139,89 @@ def get_jupyter_base_url():
         if result.returncode == 0 and result.stdout.strip():
             # Parse first server (one JSON object per line)
             first_line = result.stdout.strip().split('\n')[0]
-            server_info = json.loads(first_line)
-            port = server_info.get('port', 8888)
-            base_url = server_info.get('base_url', '/').rstrip('/')
-            return f"http://127.0.0.1:{port}{base_url}"
+            return json.loads(first_line)
     except (subprocess.TimeoutExpired, FileNotFoundError, json.JSONDecodeError):
-        pass  # Fall through to other methods
+        pass
+    return None
+
+
+def _base_url_cache_path():
+    """On-disk location of the detected base URL cache."""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(
+        os.path.expanduser('~'), '.cache'
+    )
+    return os.path.join(cache_home, 'jupyterlab-notify', 'base_url')
+
+
+def _read_cached_base_url():
+    """Return the cached base URL if it is younger than the TTL, else None."""
+    try:
+        with open(_base_url_cache_path(), encoding='utf-8') as f:
+            timestamp, url = f.read().split('\n', 1)
+        if time.time() - float(timestamp) < _BASE_URL_CACHE_TTL:
+            return url.strip() or None
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _write_cached_base_url(url):
+    """Best-effort write of the detected base URL cache."""
+    path = _base_url_cache_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"{time.time()}\n{url}")
+    except OSError:
+        pass
+
+
+def _invalidate_base_url_cache():
+    """Forget the detected base URL (in-process and on disk).
+
+    Also forgets the running-server info it was derived from, so the next
+    detection rescans instead of rebuilding (and re-caching) the same URL
+    and token of a server that has gone away.
+    """
+    get_jupyter_base_url.cache_clear()
+    _running_server_info.cache_clear()
+    try:
+        os.remove(_base_url_cache_path())
+    except OSError:
+        pass
+
+
+@functools.lru_cache(maxsize=1)
+def get_jupyter_base_url():
+    """
+    Auto-detect JupyterLab base URL.
+
+    Checks in order:
+    1. On-disk cache of a recent detection (see _BASE_URL_CACHE_TTL), only
+       when the token comes from the environment
+    2. Running servers in the Jupyter runtime directory (uses localhost)
+    3. JUPYTERHUB_SERVICE_PREFIX - JupyterHub environment variable
+    4. Default: http://localhost:8888
+
+    The result is cached for the lifetime of the process.
+    """
+    # Without an env token, detect_token() takes the token from the running
+    # server scan, so the URL must come from that same scan - a cached URL
+    # could belong to another server than the token. The scan runs anyway
+    # in that case, so the disk cache would save nothing.
+    if _env_token():
+        cached_url = _read_cached_base_url()
+        if cached_url:
+            return cached_url
+
+    # Try to detect from running Jupyter servers (preferred - always uses localhost)
+    server_info = _running_server_info()
+    if server_info:
+        port = server_info.get('port', 8888)
+        base_url = server_info.get('base_url', '/').rstrip('/')
+        url = f"http://127.0.0.1:{port}{base_url}"
+        _write_cached_base_url(url)
+        return url
 
     # Check for JupyterHub environment
     service_prefix = os.environ.get('JUPYTERHUB_SERVICE_PREFIX')
@@ -64,6 +234,24 @@ def get_jupyter_base_url():
     return f"http://localhost:{port}"
 
 
+@functools.lru_cache(maxsize=1)
+def _env_token():
+    """First non-empty token from _TOKEN_ENV_VARS, read once per process."""
+    return next(
+        (os.environ[name] for name in _TOKEN_ENV_VARS if os.environ.get(name)),
+        None
+    )
+
+
+def reset_token_cache():
+    """Re-read the token environment variables on the next lookup.
+
+    The env token is resolved once per process; call this after changing
+    os.environ (e.g. in tests) to pick up the new value.
+    """
+    _env_token.cache_clear()
+
+
 def detect_token():
     """
     Auto-detect an auth token.
@@ -74,29 +262,15 @@ def detect_token():
 
     Checks in order:
     1. JUPYTERHUB_API_TOKEN / JPY_API_TOKEN / JUPYTER_TOKEN env vars
-    2. jupyter server list --json - the running server's token
+    2. The running server's token (runtime directory scan)
     """
-    token = (
-        os.environ.get('JUPYTERHUB_API_TOKEN') or
-        os.environ.get('JPY_API_TOKEN') or
-        os.environ.get('JUPYTER_TOKEN')
-    )
+    token = _env_token()
     if token:
         return token
 
-    try:
-        result = subprocess.run(
-            ['jupyter', 'server', 'list', '--json'],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        if result.returncode == 0 and result.stdout.strip():
-            first_line = result.stdout.strip().split('\n')[0]
-            server_info = json.loads(first_line)
-            return server_info.get('token') or None
-    except (subprocess.TimeoutExpired, FileNotFoundError, json.JSONDecodeError):
-        pass
+    server_info = _running_server_info()
+    if server_info:
+        return server_info.get('token') or None
 
     return None
 
@@ -108,7 +282,426 @@ def _is_loopback_url(url):
     http://127.0.0.1@evil.com/ or http://localhost.evil.com/ resolve to the
     real host (evil.com) and are correctly treated as remote.
     """
-    return urlparse(url).hostname in ('127.0.0.1', 'localhost', '::1')
+    return urlparse(url).hostname in _LOOPBACK_HOSTS
+
+
+@functools.lru_cache(maxsize=None)
+def _proxy_for(scheme, host):
+    """
+    Proxy to reach host over scheme as (host, port, headers), or None to
+    connect directly.
+
+    Follows the same HTTP(S)_PROXY / NO_PROXY rules as urlopen
+    (urllib.request.getproxies and proxy_bypass). Resolved once per target;
+    the headers dict carries Proxy-Authorization for proxies with
+    credentials and must not be mutated.
+    """
+    import urllib.request  # deferred to the first send; heavy to import
+
+    proxy = urllib.request.getproxies().get(scheme)
+    if not proxy or urllib.request.proxy_bypass(host):
+        return None
+
+    parts = urlparse(proxy if '://' in proxy else f'http://{proxy}')
+    headers = {}
+    if parts.username:
+        import base64
+        from urllib.parse import unquote
+
+        credentials = f"{unquote(parts.username)}:{unquote(parts.password or '')}"
+        headers['Proxy-Authorization'] = (
+            'Basic ' + base64.b64encode(credentials.encode()).decode('ascii')
+        )
+    return parts.hostname, parts.port, headers
+
+
+def _checkout_connection(key):
+    """Take an idle keep-alive connection for key, or open a new one."""
+    idle = _idle_connections.get(key)
+    if idle:
+        try:
+            return idle.pop()
+        except IndexError:
+            pass  # Drained by another thread between the check and the pop
+    scheme, host, port = key
+    proxy = _proxy_for(scheme, host)
+    if proxy is not None:
+        proxy_host, proxy_port, proxy_headers = proxy
+        if scheme == 'https':
+            # TLS end-to-end through a CONNECT tunnel
+            conn = http.client.HTTPSConnection(proxy_host, proxy_port, timeout=_TIMEOUT)
+            conn.set_tunnel(host, port, headers=proxy_headers)
+            return conn
+        return http.client.HTTPConnection(proxy_host, proxy_port, timeout=_TIMEOUT)
+    if scheme == 'https':
+        return http.client.HTTPSConnection(host, port, timeout=_TIMEOUT)
+    return http.client.HTTPConnection(host, port, timeout=_TIMEOUT)
+
+
+def _post_json(endpoint, body, headers):
+    """
+    POST a JSON body over a pooled keep-alive connection.
+
+    Mirrors the urlopen contract the callers were written against: returns
+    (response headers, body bytes) on success, raises urllib.error.HTTPError for a
+    non-2xx status and urllib.error.URLError when the server is unreachable.
+    503 responses are retried up to _MAX_RETRIES times first. Proxies are
+    honoured as urlopen would (see _proxy_for).
+    """
+    parts = urlparse(endpoint)
+    key = (parts.scheme, parts.hostname, parts.port)
+    path = parts.path or '/'
+    if parts.query:
+        path = f"{path}?{parts.query}"
+    proxy = _proxy_for(parts.scheme, parts.hostname)
+    if proxy is not None and parts.scheme == 'http':
+        # A forwarding proxy takes the absolute URL as the request target
+        path = endpoint
+        headers = {**headers, **proxy[2]}
+
+    retries = 0
+    while True:
+        conn = _checkout_connection(key)
+        reused = conn.sock is not None
+        try:
+            conn.request('POST', path, body=body, headers=headers)
+            response = conn.getresponse()
+            response_body = response.read()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as e:
+            conn.close()
+            if reused:
+                # The server dropped the idle socket before reading our request
+                # (keep-alive timeout) - retry once on a fresh connection.
+                continue
+            raise urllib.error.URLError(e)
+        except (OSError, http.client.HTTPException) as e:
+            conn.close()
+            raise urllib.error.URLError(e)
+
+        idle = _idle_connections.setdefault(key, [])
+        if response.will_close or len(idle) >= _MAX_IDLE_PER_HOST:
+            conn.close()
+        else:
+            idle.append(conn)
+
+        if response.status in _RETRY_STATUSES and retries < _MAX_RETRIES:
+            # The server, or a proxy in front of it (e.g. JupyterHub's), is
+            # temporarily unavailable - typically a restart in progress.
+            # Back off and retry.
+            time.sleep(_RETRY_BACKOFF * 2 ** retries)
+            retries += 1
+            continue
+        break
+
+    if not 200 <= response.status < 300:
+        raise urllib.error.HTTPError(
+            endpoint, response.status, response.reason,
+            response.headers, io.BytesIO(response_body)
+        )
+    return response.headers, response_body
+
+
+@functools.lru_cache(maxsize=8)
+def _prepare(base_url, token):
+    """
+    Ingest endpoint and request headers for a server, built once per
+    (base_url, token) so repeated clients skip the string formatting.
+
+    The headers dict is shared between callers and must not be mutated.
+    """
+    # The token travels in the Authorization header only, never in the URL,
+    # so it does not land in server access logs.
+    endpoint = f"{base_url}/jupyterlab-notifications-extension/ingest"
+
+    headers = {
+        'Content-Type': 'application/json'
+    }
+
+    # Add authorization header if a token is available
+    if token:
+        headers['Authorization'] = f'token {token}'
+
+    return endpoint, headers
+
+
+def _build_payload(
+    message: str,
+    notification_type: str = "info",
+    auto_close: int = 5000,
+    actions: list = None,
+    data: dict = None,
+    immediate: bool = False
+):
+    """Build the ingest payload for one notification (optional keys omitted)."""
+    payload = {
+        "message": message,
+        "type": notification_type,
+        "autoClose": auto_close
+    }
+
+    if actions is not None:
+        payload["actions"] = actions
+
+    if data is not None:
+        payload["data"] = data
+
+    if immediate:
+        payload["immediate"] = True
+
+    return payload
+
+
+class NotifierClient:
+    """
+    Notification sender bound to one JupyterLab server.
+
+    Resolves the base URL, auth token, endpoint and headers once at
+    construction (the latter two cached across clients, see _prepare), so
+    each send only builds and posts a body over the shared keep-alive
+    connection pool. Reuse one client when sending repeatedly.
+
+    Args:
+        base_url: Base URL of the JupyterLab server (auto-detected if not provided)
+        token: Authentication token (optional for localhost)
+        verbose: Print debug information
+    """
+
+    def __init__(self, base_url: str = None, token: str = None, verbose: bool = False):
+        # Auto-detect base URL if not provided (always a loopback address).
+        if base_url is None:
+            base_url = get_jupyter_base_url()
+
+        # Auto-detect a token only for a loopback target (auto-detected, or an
+        # explicit 127.0.0.1/localhost --url). The server's token-free localhost
+        # bypass is opt-in / off by default, so a token is normally required; but
+        # never auto-attach the local server's token to a remote --url - that would
+        # leak it. Pass --token explicitly for a remote server.
+        if token is None and _is_loopback_url(base_url):
+            token = detect_token()
+
+        if verbose:
+            print(f"Using base URL: {base_url}")
+            if token:
+                print("Using authentication token")
+            else:
+                print("No authentication token (pass --token for a remote server)")
+            print()
+
+        self.base_url = base_url
+        self.verbose = verbose
+        self.endpoint, self.headers = _prepare(base_url, token)
+
+    def send(
+        self,
+        message: str,
+        notification_type: str = "info",
+        auto_close: int = 5000,
+        actions: list = None,
+        data: dict = None,
+        immediate: bool = False,
+        return_result: bool = True
+    ):
+        """
+        Send one notification; arguments match send_notification_api.
+
+        With return_result=False (fire-and-forget) the response is not
+        decoded or reported and None is returned; errors still raise.
+        """
+        payload = _build_payload(
+            message, notification_type, auto_close, actions, data, immediate
+        )
+        headers, body = self._post(payload)
+        if not return_result:
+            return None
+        # The server echoes the id in a header; skip decoding the body then
+        notification_id = headers.get('X-Notification-Id')
+        if notification_id:
+            result = {"success": True, "notification_id": notification_id}
+        else:
+            result = json.loads(body)
+        print(f"Notification sent: {result.get('notification_id')}")
+        return result
+
+    def send_many(self, items: list, return_result: bool = True):
+        """
+        Send several notifications in a single HTTP request.
+
+        Args:
+            items: List of dicts with the keyword arguments of send()
+            return_result: Decode and report the response (False skips it
+                and returns None)
+
+        Returns:
+            Server response; notification_ids are in the same order as items
+        """
+        payload = [_build_payload(**item) for item in items]
+        body = self._post(payload)[1]
+        if not return_result:
+            return None
+        result = json.loads(body)
+        for notification_id in result.get('notification_ids', []):
+            print(f"Notification sent: {notification_id}")
+        return result
+
+    def _post(self, body):
+        """POST a payload (dict or list) and return (response headers, body bytes)."""
+        # Convert to JSON
+        json_data = _dumps(body)
+
+        # Debug: print JSON body if verbose mode enabled
+        if self.verbose:
+            print("Sending JSON payload:")
+            print(json.dumps(body, indent=2))
+            print()
+
+        headers = self.headers
+        if len(json_data) > _GZIP_MIN_BYTES and self.endpoint in _gzip_endpoints:
+            import gzip  # only large payloads pay for the import
+
+            json_data = gzip.compress(json_data, compresslevel=1)
+            headers = dict(headers, **{'Content-Encoding': 'gzip'})
+
+        try:
+            response_headers, response_body = _post_json(self.endpoint, json_data, headers)
+        except urllib.error.HTTPError as e:
+            error_body = e.read().decode('utf-8')
+            print(f"HTTP Error {e.code}: {e.reason}")
+            print(f"Response: {error_body}")
+            raise
+        except urllib.error.URLError as e:
+            # The cached URL may point at a server that has since gone away
+            _invalidate_base_url_cache()
+            print(f"URL Error: {e.reason}")
+            print(f"Is JupyterLab running at {self.base_url}?")
+            raise
+
+        if 'gzip' in response_headers.get('Accept-Encoding', ''):
+            _gzip_endpoints.add(self.endpoint)
+        return response_headers, response_body
+
+
+class NotificationQueue:
+    """
+    Background sender that batches notifications produced in quick succession.
+
+    enqueue() returns immediately; a worker thread posts everything queued
+    as one batch request once max_batch items are waiting or max_delay_ms
+    has passed since the first one, whichever comes first. Suits producers
+    that fire many events (e.g. one per training epoch). Anything still
+    queued is flushed by close(), which also runs at interpreter exit; the
+    queue can be used as a context manager.
+
+    enqueue() builds and encodes each notification up front, so a bad
+    argument raises in the caller's thread (the payload is encoded again
+    with its batch when sent). Sending happens off that thread, so a failed
+    batch is reported on stdout like any send and dropped.
+
+    Args:
+        base_url: Base URL of the JupyterLab server (auto-detected if not provided)
+        token: Authentication token (optional for localhost)
+        max_batch: Largest number of notifications per request
+        max_delay_ms: Longest time a notification waits for others to join it
+        verbose: Print debug information
+    """
+
+    def __init__(
+        self,
+        base_url: str = None,
+        token: str = None,
+        max_batch: int = 32,
+        max_delay_ms: int = 50,
+        verbose: bool = False
+    ):
+        import atexit
+        import threading  # only queue users need a worker thread
+
+        if max_batch < 1:
+            raise ValueError(f"max_batch must be at least 1, got {max_batch}")
+        if max_delay_ms < 0:
+            raise ValueError(f"max_delay_ms must not be negative, got {max_delay_ms}")
+
+        self._client = NotifierClient(base_url, token, verbose)
+        self._max_batch = max_batch
+        self._max_delay = max_delay_ms / 1000
+        self._pending = collections.deque()
+        self._closed = False
+        # Guards _closed against enqueue(), so nothing is appended after
+        # close() has taken its final flush
+        self._state_lock = threading.Lock()
+        # Serializes sends, so an explicit flush and the worker never post
+        # the same items or interleave batches out of order
+        self._send_lock = threading.Lock()
+        self._queued = threading.Event()
+        self._full = threading.Event()
+
+        self._worker = threading.Thread(
+            target=self._run, name="jupyterlab-notify-queue", daemon=True
+        )
+        self._worker.start()
+        atexit.register(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def enqueue(self, message: str, **kwargs):
+        """
+        Queue one notification; keyword arguments match NotifierClient.send.
+
+        Raises TypeError for an unknown argument or a value that cannot be
+        encoded as JSON, and ValueError once the queue is closed.
+        """
+        payload = _build_payload(message, **kwargs)
+        # Encoded once here to validate; the batch is encoded again on send
+        _dumps(payload)
+        with self._state_lock:
+            if self._closed:
+                raise ValueError("NotificationQueue is closed")
+            self._pending.append(payload)
+        self._queued.set()
+        if len(self._pending) >= self._max_batch:
+            self._full.set()
+
+    def flush(self):
+        """Send everything queued so far, in batches of at most max_batch."""
+        with self._send_lock:
+            while self._pending:
+                batch = []
+                while self._pending and len(batch) < self._max_batch:
+                    batch.append(self._pending.popleft())
+                try:
+                    self._client._post(batch)
+                except urllib.error.URLError:
+                    pass  # Already reported by the client; nobody to raise to
+                except Exception as e:
+                    print(f"Failed to send {len(batch)} queued notification(s): {e!r}")
+
+    def close(self):
+        """Stop the worker and send whatever is still queued. Idempotent."""
+        import atexit
+
+        with self._state_lock:
+            if self._closed:
+                return
+            self._closed = True
+        atexit.unregister(self.close)
+        # Wake the worker so it sees _closed and exits
+        self._queued.set()
+        self._full.set()
+        self._worker.join()
+        self.flush()
+
+    def _run(self):
+        while not self._closed:
+            # Sleep until something is queued, then give more items up to
+            # max_delay to arrive unless a full batch is already waiting
+            self._queued.wait()
+            self._full.wait(self._max_delay)
+            self._queued.clear()
+            self._full.clear()
+            self.flush()
 
 
 def send_notification_api(
@@ -136,91 +729,88 @@ def send_notification_api(
         immediate: Push instantly to connected clients via WebSocket (--now)
         verbose: Print debug information
     """
-    # Auto-detect base URL if not provided (always a loopback address).
-    if base_url is None:
-        base_url = get_jupyter_base_url()
-
-    if verbose:
-        print(f"Using base URL: {base_url}")
-
-    # Auto-detect a token only for a loopback target (auto-detected, or an
-    # explicit 127.0.0.1/localhost --url). The server's token-free localhost
-    # bypass is opt-in / off by default, so a token is normally required; but
-    # never auto-attach the local server's token to a remote --url - that would
-    # leak it. Pass --token explicitly for a remote server.
-    if token is None and _is_loopback_url(base_url):
-        token = detect_token()
-
-    if verbose:
-        if token:
-            print("Using authentication token")
-        else:
-            print("No authentication token (pass --token for a remote server)")
-        print()
+    client = NotifierClient(base_url, token, verbose)
+    return client.send(
+        message, notification_type, auto_close, actions, data, immediate
+    )
 
-    # Construct the endpoint URL. The token travels in the Authorization header
-    # only (below), never in the URL, so it does not land in server access logs.
-    endpoint = f"{base_url}/jupyterlab-notifications-extension/ingest"
 
-    # Build notification payload
-    payload = {
-        "message": message,
-        "type": notification_type,
-        "autoClose": auto_close
-    }
+def send_notifications_api(
+    base_url: str = None,
+    items: list = (),
+    token: str = None,
+    verbose: bool = False
+):
+    """
+    Send several notifications in a single HTTP request.
 
-    if actions is not None:
-        payload["actions"] = actions
+    The ingest endpoint accepts a JSON array, so N notifications cost one
+    round-trip instead of N.
 
-    if data is not None:
-        payload["data"] = data
+    Args:
+        base_url: Base URL of the JupyterLab server (auto-detected if not provided)
+        items: List of dicts with the keyword arguments of send_notification_api
+            (message, notification_type, auto_close, actions, data, immediate)
+        token: Authentication token (optional for localhost)
+        verbose: Print debug information
 
-    if immediate:
-        payload["immediate"] = True
+    Returns:
+        Server response; notification_ids are in the same order as items
+    """
+    return NotifierClient(base_url, token, verbose).send_many(items)
 
-    # Convert to JSON
-    json_data = json.dumps(payload).encode('utf-8')
 
-    # Debug: print JSON body if verbose mode enabled
-    if verbose:
-        print("Sending JSON payload:")
-        print(json.dumps(payload, indent=2))
-        print()
+async def send_notifications_async(
+    base_url: str = None,
+    items: list = (),
+    token: str = None,
+    verbose: bool = False
+):
+    """
+    Awaitable form of send_notifications_api for code running in an event loop.
 
-    # Build headers
-    headers = {
-        'Content-Type': 'application/json'
-    }
+    The batch is still a single HTTP request; it runs in the loop's default
+    executor so a notebook or async service is not blocked while it waits
+    on the network. Arguments and return value match send_notifications_api.
+    """
+    import asyncio  # ~30ms to import; only async callers should pay for it
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        None,
+        functools.partial(
+            send_notifications_api,
+            base_url=base_url,
+            items=items,
+            token=token,
+            verbose=verbose
+        )
+    )
 
-    # Add authorization header if a token is available
-    if token:
-        headers['Authorization'] = f'token {token}'
 
-    # Create request
-    req = urllib.request.Request(
-        endpoint,
-        data=json_data,
-        headers=headers,
-        method='POST'
-    )
+def _fast_main(argv):
+    """
+    Handle the plain `-m "message"` invocation without building the parser.
+
+    Returns an exit code, or None when argv needs the full argparse path.
+    """
+    if len(argv) != 2 or argv[0] not in ('-m', '--message') or argv[1].startswith('-'):
+        return None
 
     try:
-        with urllib.request.urlopen(req) as response:
-            result = json.loads(response.read().decode('utf-8'))
-            print(f"Notification sent: {result.get('notification_id')}")
-            return result
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode('utf-8')
-        print(f"HTTP Error {e.code}: {e.reason}")
-        print(f"Response: {error_body}")
-        raise
-    except urllib.error.URLError as e:
-        print(f"URL Error: {e.reason}")
-        print(f"Is JupyterLab running at {base_url}?")
-        raise
+        send_notification_api(message=argv[1])
+        return 0
+    except Exception:
+        return 1
 
 
 def main():
+    exit_code = _fast_main(sys.argv[1:])
+    if exit_code is not None:
+        return exit_code
+
+    import argparse  # deferred: the common `-m "..."` case never needs it
+
     parser = argparse.ArgumentParser(
         description="Send notifications to JupyterLab",
         epilog="""
@@ -245,18 +835,22 @@ Examples:
 
   # Immediate display (push now, don't wait for the next poll)
   %(prog)s -m "Deploy finished" --now
+
+  # Several notifications in one request
+  %(prog)s -m "Step 1 done" -m "Step 2 done" -t success
         """,
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
     parser.add_argument(
         "--url",
         default=None,
-        help="JupyterLab base URL (auto-detected from running servers via 'jupyter server list')"
+        help="JupyterLab base URL (auto-detected from running Jupyter servers)"
     )
     parser.add_argument(
         "--message", "-m",
+        action="append",
         default=None,
-        help="Notification message (required)"
+        help="Notification message (required; repeat to send several in one request)"
     )
     parser.add_argument(
         "--type", "-t",
@@ -360,22 +954,40 @@ Examples:
             action_obj["caption"] = "Close this notification"
         actions = [action_obj]
 
-    # Get URL (auto-detect if not specified)
+    # Get URL once (auto-detect if not specified); --verbose reports it
     url = args.url if args.url else get_jupyter_base_url()
-    print(f"URL: {url} | Type: {args.type}")
 
     try:
-        send_notification_api(
-            base_url=args.url,
-            message=args.message,
-            notification_type=args.type,
-            auto_close=auto_close,
-            actions=actions,
-            data=data_dict,
-            token=args.token,
-            immediate=args.immediate,
-            verbose=args.verbose
-        )
+        if len(args.message) > 1:
+            items = [
+                {
+                    "message": message,
+                    "notification_type": args.type,
+                    "auto_close": auto_close,
+                    "actions": actions,
+                    "data": data_dict,
+                    "immediate": args.immediate
+                }
+                for message in args.message
+            ]
+            send_notifications_api(
+                base_url=url,
+                items=items,
+                token=args.token,
+                verbose=args.verbose
+            )
+        else:
+            send_notification_api(
+                base_url=url,
+                message=args.message[0],
+                notification_type=args.type,
+                auto_close=auto_close,
+                actions=actions,
+                data=data_dict,
+                token=args.token,
+                immediate=args.immediate,
+                verbose=args.verbose
+            )
         return 0
     except Exception:
         return 1
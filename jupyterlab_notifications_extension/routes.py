@@ -1,7 +1,10 @@
+import collections
 import itertools
 import json
+import threading
 import time
-from typing import Dict, List, Set
+import zlib
+from typing import Deque, Dict, List, Set
 
 from jupyter_server.base.handlers import APIHandler, JupyterHandler
 from jupyter_server.base.websocket import WebSocketMixin
@@ -10,6 +13,36 @@ from jupyter_server.utils import url_path_join
 from tornado.websocket import WebSocketHandler, WebSocketClosedError
 import tornado
 
+# JSON codec bound once at import: orjson if installed (pip install orjson),
+# else ujson, else the stdlib. Every variant parses bytes and encodes to
+# bytes. _DECODE_ERRORS lists what a malformed body raises: decode errors
+# (orjson's subclasses json.JSONDecodeError), UnicodeDecodeError, which
+# stdlib json raises for malformed UTF-8, and RecursionError, which stdlib
+# json raises for very deeply nested input. _ENCODE_ERRORS lists what
+# encoding a parsed payload can still raise: orjson (TypeError) and ujson
+# (OverflowError) accept deeper nesting on input than they write back.
+try:
+    import orjson
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+    _DECODE_ERRORS = (json.JSONDecodeError, UnicodeDecodeError, RecursionError)
+except ImportError:
+    try:
+        import ujson
+
+        def _dumps(obj):
+            return ujson.dumps(obj).encode('utf-8')
+        _loads = ujson.loads
+        _DECODE_ERRORS = (
+            getattr(ujson, 'JSONDecodeError', ValueError), UnicodeDecodeError, RecursionError
+        )
+    except ImportError:
+        def _dumps(obj):
+            return json.dumps(obj).encode('utf-8')
+        _loads = json.loads
+        _DECODE_ERRORS = (json.JSONDecodeError, UnicodeDecodeError, RecursionError)
+
+_ENCODE_ERRORS = (TypeError, ValueError, OverflowError, RecursionError)
 
 # Single source for the extension's URL namespace (see also request.ts)
 API_NAMESPACE = "jupyterlab-notifications-extension"
@@ -17,21 +50,94 @@ API_NAMESPACE = "jupyterlab-notifications-extension"
 # web_app.settings key gating the localhost auth bypass (opt-in, default off)
 ALLOW_UNAUTH_LOCALHOST_SETTING = "jupyterlab_notifications_allow_unauthenticated_localhost"
 
+# Loopback peer addresses. remote_ip is always a literal address, so the
+# hostname "localhost" can never match and is deliberately left out.
+_LOCALHOST_IPS = frozenset(("127.0.0.1", "::1"))
+
+# Largest request body accepted after gzip decompression, so a small
+# compressed upload cannot expand into an unbounded amount of memory
+MAX_DECOMPRESSED_BODY = 10 * 1024 * 1024
+
+# Static error response bodies, serialized once at import
+_MISSING_MESSAGE_BODY = _dumps({"error": "Missing 'message' field"})
+_MISSING_BATCH_BODY = _dumps({"error": "Missing 'notifications' list"})
+_INVALID_JSON_BODY = _dumps({"error": "Invalid JSON payload"})
+_INTERNAL_ERROR_BODY = _dumps({"error": "Internal server error"})
+_INVALID_FIELD_BODY = _dumps({"error": "Invalid notification field type"})
+_UNENCODABLE_BODY = _dumps({"error": "Notification cannot be re-encoded (nested too deeply?)"})
+_INVALID_GZIP_BODY = _dumps({"error": "Invalid or oversized gzip body"})
+
+# Single-ingest success reply, assembled around the id without building and
+# encoding a dict. Ids are notif_<digits>_<digits>, so no escaping is needed.
+_INGEST_REPLY_PREFIX = b'{"success":true,"notification_id":"'
+_INGEST_REPLY_SUFFIX = b'"}'
+
+# Expected JSON types of the optional ingest fields, checked in one pass
+# per item so a bad type is a 400 rather than a notification the frontend
+# cannot render. autoClose also accepts false (bool is an int subclass).
+_OPTIONAL_FIELD_TYPES = (
+    ("type", str),
+    ("autoClose", (int, float)),
+    ("actions", list),
+)
+
+# Shared immutable default for notifications without action buttons: saves
+# a fresh list per ingest and serializes to [] like one.
+_NO_ACTIONS = ()
+
 # Process-lifetime monotonic counter for notification ids. Guarantees a
 # unique id even across store drains (unlike len(_notification_store),
 # which resets to 0 on every fetch and could collide).
 _id_counter = itertools.count(1)
 
-# In-memory storage for notifications (broadcast to all users)
-_notification_store: List[Dict] = []
+# Cap on notifications awaiting a fetch. If no client polls, the oldest are
+# dropped past this point instead of growing the server's memory forever.
+MAX_PENDING_NOTIFICATIONS = 10_000
+
+# In-memory storage for notifications (broadcast to all users), each kept
+# as its JSON encoding: ingest encodes a notification once and fetch and
+# the immediate push only join those bytes. A deque that is never rebound:
+# ingest appends, fetch snapshots and clears it. maxlen evicts the oldest
+# entry in O(1) once the cap is reached.
+_notification_store: Deque[bytes] = collections.deque(maxlen=MAX_PENDING_NOTIFICATIONS)
+
+# Guards _notification_store across threads. Handlers run on the event loop
+# today, where it is never contended (an uncontended acquire is cheap); it
+# keeps append and drain atomic for callers on other threads and on
+# free-threaded CPython builds, where the GIL no longer does.
+_store_lock = threading.Lock()
 
 # Live WebSocket listeners for immediate ("--now") push delivery
 _stream_listeners: Set["NotificationStreamHandler"] = set()
 
 
-def _push_immediate(notification: Dict, log) -> None:
-    """Push a single notification to all connected WebSocket listeners."""
-    message = json.dumps({"notifications": [notification]})
+def _gunzip(body: bytes):
+    """Decompress a gzip request body, or return None if it is invalid or
+    would exceed MAX_DECOMPRESSED_BODY."""
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)  # gzip framing
+    try:
+        data = decompressor.decompress(body, MAX_DECOMPRESSED_BODY)
+    except zlib.error:
+        return None
+    if decompressor.unconsumed_tail or not decompressor.eof:
+        return None
+    return data
+
+
+def _envelope(encoded: List[bytes]) -> bytes:
+    """{"notifications": [...]} around already-encoded notifications."""
+    return b'{"notifications":[' + b','.join(encoded) + b']}'
+
+
+def _push_immediate(encoded: List[bytes], log) -> None:
+    """Push encoded notifications to all connected WebSocket listeners.
+
+    Joined once into a single message that every listener shares.
+    """
+    # Pre-encoded bytes: the frame type follows write_message's binary flag
+    # (default False = text), and tornado passes bytes through without the
+    # str -> UTF-8 coercion it applies to every str message.
+    message = _envelope(encoded)
     for listener in list(_stream_listeners):
         try:
             listener.write_message(message)
@@ -49,6 +155,10 @@ class NotificationIngestHandler(APIHandler):
     """
     POST endpoint for external entities to send notifications.
 
+    Accepts a single notification object, or a JSON array of them to ingest
+    a batch in one request (response then carries "notification_ids" in
+    request order).
+
     Expected payload:
     {
         "message": "Your notification message",
@@ -65,9 +175,15 @@ class NotificationIngestHandler(APIHandler):
     }
     """
 
+    def set_default_headers(self):
+        super().set_default_headers()
+        # Advertise gzip request bodies (RFC 7694): clients compress only
+        # for servers that announced they can decompress
+        self.set_header("Accept-Encoding", "gzip")
+
     def _is_localhost(self):
         """Check if request is from a genuine loopback peer."""
-        return self.request.remote_ip in ('127.0.0.1', '::1')
+        return self.request.remote_ip in _LOCALHOST_IPS
 
     def _allow_unauthenticated_localhost(self):
         """Whether the operator opted in to token-free localhost ingest."""
@@ -89,50 +205,160 @@ class NotificationIngestHandler(APIHandler):
 
     @tornado.web.authenticated
     def post(self):
+        body = self.request.body
+        # Clients compress large payloads (big "data" fields, batches)
+        if self.request.headers.get("Content-Encoding") == "gzip":
+            body = _gunzip(body)
+            if body is None:
+                self.set_status(400)
+                self.finish(_INVALID_GZIP_BODY)
+                return
+
         try:
-            payload = json.loads(self.request.body.decode('utf-8'))
+            payload = _loads(body)
+        except _DECODE_ERRORS:
+            # The body is parsed as raw bytes, so malformed UTF-8 is a bad
+            # payload too
+            self.set_status(400)
+            self.finish(_INVALID_JSON_BODY)
+            return
 
-            # Validate required fields
-            if 'message' not in payload:
+        # Anything past the parse is a server bug, not a bad payload. Answer
+        # it with a static body rather than APIHandler.write_error, which
+        # includes the traceback before jupyter_server 2.11.2.
+        try:
+            self._ingest(payload)
+        except Exception:
+            # Log the detail server-side; do not leak internals to the client
+            self.log.exception("Failed to ingest notification")
+            self.set_status(500)
+            self.finish(_INTERNAL_ERROR_BODY)
+
+    def _ingest(self, payload):
+        """Validate, store and acknowledge a parsed ingest payload."""
+        items, is_batch = self._unpack(payload)
+        if items is None:
+            self.set_status(400)
+            self.finish(_MISSING_BATCH_BODY)
+            return
+
+        # Validate every item before storing any (all-or-nothing for a batch)
+        for item in items:
+            error_body = self._validate(item)
+            if error_body is not None:
                 self.set_status(400)
-                self.finish(json.dumps({"error": "Missing 'message' field"}))
+                self.finish(error_body)
                 return
 
-            # Create notification object
-            notification = {
-                "id": f"notif_{int(time.time() * 1000)}_{next(_id_counter)}",
-                "message": payload['message'],
-                "type": payload.get('type', 'info'),
-                "autoClose": payload.get('autoClose', 5000),
-                "createdAt": int(time.time() * 1000),
-                "actions": payload.get('actions', []),
-                "data": payload.get('data')
-            }
-
-            # Add to the broadcast queue. NOTE: the poll fetch is a
-            # destructive, single-consumer drain - the first client to poll
-            # empties the queue for all clients - so queue delivery is
-            # best-effort, not a per-client guarantee. Immediate ("--now")
-            # notifications are additionally pushed to every currently
-            # connected socket below for instant, all-tabs delivery.
-            _notification_store.append(notification)
+        # One clock read per request, shared by every item in a batch
+        now_ms = time.time_ns() // 1_000_000
+        notifications = [self._create_notification(item, now_ms) for item in items]
 
-            if payload.get('immediate'):
-                _push_immediate(notification, self.log)
+        # Encode each notification once, for every later fetch and push. A
+        # payload that parses but cannot be encoded again (orjson reads
+        # deeper nesting than it writes) is rejected before anything is stored
+        try:
+            encoded = [_dumps(notification) for notification in notifications]
+        except _ENCODE_ERRORS:
+            self.set_status(400)
+            self.finish(_UNENCODABLE_BODY)
+            return
+
+        # Add to the broadcast queue. NOTE: the poll fetch is a
+        # destructive, single-consumer drain - the first client to poll
+        # empties the queue for all clients - so queue delivery is
+        # best-effort, not a per-client guarantee. Immediate ("--now")
+        # notifications are additionally pushed to every currently
+        # connected socket below for instant, all-tabs delivery.
+        with _store_lock:
+            _notification_store.extend(encoded)
+
+        # One push message per request, however many items are immediate
+        immediate = [
+            notification
+            for item, notification in zip(items, encoded)
+            if item.get('immediate')
+        ]
+        if immediate:
+            _push_immediate(immediate, self.log)
 
-            self.finish(json.dumps({
+        if is_batch:
+            # ids are returned in request order
+            self.finish(_dumps({
                 "success": True,
-                "notification_id": notification['id']
+                "notification_ids": [n['id'] for n in notifications]
             }))
+        else:
+            notification_id = notifications[0]['id']
+            # Lets clients read the id without parsing the JSON body
+            self.set_header("X-Notification-Id", notification_id)
+            self.finish(
+                _INGEST_REPLY_PREFIX
+                + notification_id.encode('ascii')
+                + _INGEST_REPLY_SUFFIX
+            )
 
-        except json.JSONDecodeError:
-            self.set_status(400)
-            self.finish(json.dumps({"error": "Invalid JSON payload"}))
-        except Exception:
-            # Log the detail server-side; do not leak internals to the client
-            self.log.exception("Failed to ingest notification")
-            self.set_status(500)
-            self.finish(json.dumps({"error": "Internal server error"}))
+    @staticmethod
+    def _unpack(payload):
+        """Split a parsed body into (items, is_batch).
+
+        A JSON array ingests a batch of notifications in one request.
+        """
+        if isinstance(payload, list):
+            return payload, True
+        return [payload], False
+
+    @staticmethod
+    def _validate(item):
+        """Return the error body for a malformed ingest item, or None if valid."""
+        if not isinstance(item, dict) or not isinstance(item.get('message'), str):
+            return _MISSING_MESSAGE_BODY
+        for field, expected in _OPTIONAL_FIELD_TYPES:
+            if field in item and not isinstance(item[field], expected):
+                return _INVALID_FIELD_BODY
+        return None
+
+    @staticmethod
+    def _create_notification(payload: Dict, now_ms: int) -> Dict:
+        """Create a notification object from a validated ingest payload.
+
+        now_ms feeds both the id and createdAt, so the two never disagree.
+        """
+        return {
+            "id": f"notif_{now_ms}_{next(_id_counter)}",
+            "message": payload['message'],
+            "type": payload.get('type', 'info'),
+            "autoClose": payload.get('autoClose', 5000),
+            "createdAt": now_ms,
+            "actions": payload.get('actions', _NO_ACTIONS),
+            "data": payload.get('data')
+        }
+
+
+class NotificationBatchIngestHandler(NotificationIngestHandler):
+    """
+    POST endpoint ingesting a batch wrapped in an object.
+
+    Same authentication, validation and response as a JSON array posted to
+    the ingest endpoint (ids in "notification_ids", request order), for
+    clients that prefer an object envelope.
+
+    Expected payload:
+    {
+        "notifications": [
+            {"message": "First"},
+            {"message": "Second", "type": "success"}
+        ]
+    }
+    """
+
+    @staticmethod
+    def _unpack(payload):
+        """Return the wrapped items, or (None, True) if the envelope is malformed."""
+        items = payload.get('notifications') if isinstance(payload, dict) else None
+        if not isinstance(items, list):
+            return None, True
+        return items, True
 
 
 class NotificationFetchHandler(APIHandler):
@@ -143,15 +369,14 @@ class NotificationFetchHandler(APIHandler):
 
     @tornado.web.authenticated
     def get(self):
-        global _notification_store
-
-        # Get all pending notifications
-        notifications = _notification_store.copy()
-
-        # Clear the queue
-        _notification_store = []
+        # Take everything pending and clear the queue, held together by the
+        # lock so no producer can append in between. Notifications are stored
+        # encoded, so the reply is a join - nothing is serialized here.
+        with _store_lock:
+            body = _envelope(_notification_store)
+            _notification_store.clear()
 
-        self.finish(json.dumps({"notifications": notifications}))
+        self.finish(body)
 
 
 class NotificationStreamHandler(WebSocketMixin, WebSocketHandler, JupyterHandler):
@@ -191,18 +416,24 @@ class NotificationStreamHandler(WebSocketMixin, WebSocketHandler, JupyterHandler
         await super().get(*args, **kwargs)
 
 
+# Route table: path under API_NAMESPACE -> handler
+_ROUTES = (
+    ("ingest", NotificationIngestHandler),
+    ("ingest/batch", NotificationBatchIngestHandler),
+    ("notifications", NotificationFetchHandler),
+    ("stream", NotificationStreamHandler),
+)
+
+
 def setup_route_handlers(web_app):
     host_pattern = ".*$"
     base_url = web_app.settings["base_url"]
 
-    ingest_route_pattern = url_path_join(base_url, API_NAMESPACE, "ingest")
-    fetch_route_pattern = url_path_join(base_url, API_NAMESPACE, "notifications")
-    stream_route_pattern = url_path_join(base_url, API_NAMESPACE, "stream")
-
+    # url_path_join (plain string joins, no regex) normalizes any base_url
+    # slash form; it runs once per route at server startup.
     handlers = [
-        (ingest_route_pattern, NotificationIngestHandler),
-        (fetch_route_pattern, NotificationFetchHandler),
-        (stream_route_pattern, NotificationStreamHandler),
+        (url_path_join(base_url, API_NAMESPACE, path), handler)
+        for path, handler in _ROUTES
     ]
 
     web_app.add_handlers(host_pattern, handlers)
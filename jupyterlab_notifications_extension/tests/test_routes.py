@@ -23,6 +23,7 @@ async def test_notification_ingest(jp_fetch):
     payload = json.loads(response.body)
     assert payload["success"] is True
     assert payload["notification_id"].startswith("notif_")
+    assert response.headers["X-Notification-Id"] == payload["notification_id"]
 
 
 async def test_notification_fetch(jp_fetch):
@@ -139,3 +140,292 @@ async def test_remote_ip_requires_auth(jp_serverapp):
     with patch.object(handler, '_is_localhost', return_value=False):
         with patch('jupyter_server.base.handlers.APIHandler.get_current_user', return_value=None):
             assert handler.get_current_user() is None
+
+
+async def test_notification_batch_ingest(jp_fetch):
+    """A JSON array ingests several notifications, ids in request order"""
+    response = await jp_fetch(
+        "jupyterlab-notifications-extension",
+        "ingest",
+        method="POST",
+        body=json.dumps([
+            {"message": "First"},
+            {"message": "Second", "type": "success"}
+        ])
+    )
+
+    assert response.code == 200
+    ids = json.loads(response.body)["notification_ids"]
+    assert len(ids) == 2
+
+    fetch_response = await jp_fetch("jupyterlab-notifications-extension", "notifications")
+    notifications = json.loads(fetch_response.body)["notifications"]
+    assert [n["id"] for n in notifications] == ids
+    assert [n["message"] for n in notifications] == ["First", "Second"]
+    # One clock read per request: the whole batch shares createdAt
+    assert notifications[0]["createdAt"] == notifications[1]["createdAt"]
+
+
+async def test_notification_batch_rejects_missing_message(jp_fetch):
+    """A batch with any item missing 'message' is rejected as a whole"""
+    from tornado.httpclient import HTTPClientError
+
+    with pytest.raises(HTTPClientError) as excinfo:
+        await jp_fetch(
+            "jupyterlab-notifications-extension",
+            "ingest",
+            method="POST",
+            body=json.dumps([{"message": "OK"}, {"type": "info"}])
+        )
+
+    assert excinfo.value.code == 400
+    assert len(routes._notification_store) == 0
+
+
+async def test_notification_id_matches_created_at(jp_fetch):
+    """The id timestamp and createdAt come from the same clock read"""
+    await jp_fetch(
+        "jupyterlab-notifications-extension", "ingest",
+        method="POST", body=json.dumps({"message": "A"})
+    )
+
+    response = await jp_fetch("jupyterlab-notifications-extension", "notifications")
+    notification = json.loads(response.body)["notifications"][0]
+    assert notification["id"].split("_")[1] == str(notification["createdAt"])
+
+
+async def test_notification_utf8_body(jp_fetch):
+    """The raw UTF-8 request body is parsed without a separate decode step"""
+    await jp_fetch(
+        "jupyterlab-notifications-extension",
+        "ingest",
+        method="POST",
+        body=json.dumps({"message": "Zażółć ✓"}, ensure_ascii=False).encode("utf-8")
+    )
+
+    response = await jp_fetch("jupyterlab-notifications-extension", "notifications")
+    assert json.loads(response.body)["notifications"][0]["message"] == "Zażółć ✓"
+
+
+@pytest.mark.parametrize("body", [b"{not json", b'{"message": "\xff"}'])
+async def test_notification_invalid_body_rejected(jp_fetch, body):
+    """Malformed JSON and malformed UTF-8 are both a 400, not a 500"""
+    from tornado.httpclient import HTTPClientError
+
+    with pytest.raises(HTTPClientError) as excinfo:
+        await jp_fetch(
+            "jupyterlab-notifications-extension",
+            "ingest",
+            method="POST",
+            body=body
+        )
+
+    assert excinfo.value.code == 400
+
+
+@pytest.mark.parametrize("payload", [
+    {"message": 42},
+    {"message": "Test", "type": None},
+    {"message": "Test", "autoClose": "soon"},
+    {"message": "Test", "actions": "Dismiss"}
+])
+async def test_notification_invalid_field_type_rejected(jp_fetch, payload):
+    """Fields of the wrong JSON type are a 400 and nothing is stored"""
+    from tornado.httpclient import HTTPClientError
+
+    with pytest.raises(HTTPClientError) as excinfo:
+        await jp_fetch(
+            "jupyterlab-notifications-extension",
+            "ingest",
+            method="POST",
+            body=json.dumps(payload)
+        )
+
+    assert excinfo.value.code == 400
+    response = await jp_fetch("jupyterlab-notifications-extension", "notifications")
+    assert json.loads(response.body)["notifications"] == []
+
+
+async def test_notification_gzip_body(jp_fetch):
+    """A gzip-compressed body is decompressed before parsing"""
+    import gzip
+
+    await jp_fetch(
+        "jupyterlab-notifications-extension",
+        "ingest",
+        method="POST",
+        headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+        body=gzip.compress(json.dumps({"message": "Zipped", "data": {"log": "x" * 4096}}).encode())
+    )
+
+    response = await jp_fetch("jupyterlab-notifications-extension", "notifications")
+    notification = json.loads(response.body)["notifications"][0]
+    assert notification["message"] == "Zipped"
+    assert notification["data"] == {"log": "x" * 4096}
+
+
+async def test_notification_ingest_advertises_gzip(jp_fetch):
+    """Ingest responses announce gzip request bodies, errors included"""
+    from tornado.httpclient import HTTPClientError
+
+    response = await jp_fetch(
+        "jupyterlab-notifications-extension",
+        "ingest",
+        method="POST",
+        body=json.dumps({"message": "Test"})
+    )
+    assert response.headers["Accept-Encoding"] == "gzip"
+
+    with pytest.raises(HTTPClientError) as excinfo:
+        await jp_fetch(
+            "jupyterlab-notifications-extension",
+            "ingest",
+            method="POST",
+            body=b"{not json"
+        )
+    assert excinfo.value.response.headers["Accept-Encoding"] == "gzip"
+
+
+async def test_notification_invalid_gzip_rejected(jp_fetch):
+    """A body that is not valid gzip is a 400"""
+    from tornado.httpclient import HTTPClientError
+
+    with pytest.raises(HTTPClientError) as excinfo:
+        await jp_fetch(
+            "jupyterlab-notifications-extension",
+            "ingest",
+            method="POST",
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+            body=json.dumps({"message": "Not zipped"})
+        )
+
+    assert excinfo.value.code == 400
+
+
+async def test_notification_too_deep_to_encode_rejected(jp_fetch):
+    """Data that parses but cannot be encoded again is a 400 and does not
+    poison the queue for other notifications"""
+    from tornado.httpclient import HTTPClientError
+
+    # orjson (preferred when installed) parses deeper nesting than it writes
+    pytest.importorskip("orjson")
+
+    await jp_fetch(
+        "jupyterlab-notifications-extension",
+        "ingest",
+        method="POST",
+        body=json.dumps({"message": "Valid"})
+    )
+
+    depth = 300
+    deep = '{"a":' * depth + '1' + '}' * depth
+    with pytest.raises(HTTPClientError) as excinfo:
+        await jp_fetch(
+            "jupyterlab-notifications-extension",
+            "ingest",
+            method="POST",
+            body='{"message": "Deep", "immediate": true, "data": ' + deep + '}'
+        )
+    assert excinfo.value.code == 400
+
+    response = await jp_fetch("jupyterlab-notifications-extension", "notifications")
+    messages = [n["message"] for n in json.loads(response.body)["notifications"]]
+    assert messages == ["Valid"]
+
+
+async def test_notification_internal_error_is_opaque(jp_fetch, monkeypatch):
+    """An unexpected server error is a 500 with a static body, no traceback"""
+    from tornado.httpclient import HTTPClientError
+
+    def broken(payload, now_ms):
+        raise RuntimeError("secret internals")
+
+    monkeypatch.setattr(
+        routes.NotificationIngestHandler, "_create_notification", staticmethod(broken)
+    )
+
+    with pytest.raises(HTTPClientError) as excinfo:
+        await jp_fetch(
+            "jupyterlab-notifications-extension",
+            "ingest",
+            method="POST",
+            body=json.dumps({"message": "Test"})
+        )
+
+    assert excinfo.value.code == 500
+    assert json.loads(excinfo.value.response.body) == {"error": "Internal server error"}
+
+
+async def test_batch_immediate_push_is_one_message(jp_fetch):
+    """Immediate items of a batch reach each listener as a single message"""
+    from unittest.mock import MagicMock
+
+    listener = MagicMock()
+    routes._stream_listeners.add(listener)
+    try:
+        await jp_fetch(
+            "jupyterlab-notifications-extension",
+            "ingest",
+            method="POST",
+            body=json.dumps([
+                {"message": "A", "immediate": True},
+                {"message": "B"},
+                {"message": "C", "immediate": True}
+            ])
+        )
+    finally:
+        routes._stream_listeners.discard(listener)
+
+    listener.write_message.assert_called_once()
+    pushed = json.loads(listener.write_message.call_args[0][0])
+    assert [n["message"] for n in pushed["notifications"]] == ["A", "C"]
+
+
+async def test_notification_batch_endpoint(jp_fetch):
+    """The ingest/batch endpoint accepts a {"notifications": [...]} envelope"""
+    response = await jp_fetch(
+        "jupyterlab-notifications-extension",
+        "ingest",
+        "batch",
+        method="POST",
+        body=json.dumps({"notifications": [{"message": "A"}, {"message": "B"}]})
+    )
+
+    assert response.code == 200
+    ids = json.loads(response.body)["notification_ids"]
+    assert [json.loads(n)["id"] for n in routes._notification_store] == ids
+
+
+async def test_notification_batch_endpoint_requires_list(jp_fetch):
+    """A batch envelope without a notifications list is a 400"""
+    from tornado.httpclient import HTTPClientError
+
+    with pytest.raises(HTTPClientError) as excinfo:
+        await jp_fetch(
+            "jupyterlab-notifications-extension",
+            "ingest",
+            "batch",
+            method="POST",
+            body=json.dumps({"message": "not a batch"})
+        )
+
+    assert excinfo.value.code == 400
+
+
+async def test_notification_store_is_bounded(jp_fetch, monkeypatch):
+    """Past the cap the oldest pending notifications are dropped"""
+    from collections import deque
+
+    assert routes._notification_store.maxlen == routes.MAX_PENDING_NOTIFICATIONS
+
+    monkeypatch.setattr(routes, "_notification_store", deque(maxlen=2))
+    await jp_fetch(
+        "jupyterlab-notifications-extension",
+        "ingest",
+        method="POST",
+        body=json.dumps([{"message": "A"}, {"message": "B"}, {"message": "C"}])
+    )
+
+    response = await jp_fetch("jupyterlab-notifications-extension", "notifications")
+    messages = [n["message"] for n in json.loads(response.body)["notifications"]]
+    assert messages == ["B", "C"]
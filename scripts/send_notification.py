@@ -2,8 +2,19 @@
 """
 Script to send notifications to JupyterLab via the notification extension.
 
-Localhost requests do not require authentication tokens.
-Remote requests require token via --token argument or environment variables.
+Requests authenticate with a token from the --token argument or the
+JUPYTERHUB_API_TOKEN / JPY_API_TOKEN / JUPYTER_TOKEN environment variables
+(localhost needs one too unless the server allows unauthenticated
+localhost ingest).
+
+Standalone on purpose (DEF-8): only the standard library is required, so
+the file can be copied to a machine without the package to notify a
+remote server. The packaged `jupyterlab-notify` CLI
+(jupyterlab_notifications_extension.cli) adds server auto-detection,
+connection reuse and background batching (NotificationQueue).
+
+Importable as a library: send_notification, send_notifications_batch and
+send_many are the entry points; main() is the command line only.
 
 Usage:
     # Default (localhost on port 8888)
@@ -19,12 +30,36 @@ Usage:
     python scripts/send_notification.py --url "http://remote-server:8888" --message "Test" --token "your-token"
 """
 
-import argparse
+import functools
 import json
 import os
-import urllib.request
 import urllib.error
 
+# Optional C-accelerated JSON encoder (pip install orjson); both produce
+# compact bytes
+try:
+    import orjson
+    _dumps = orjson.dumps
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+# Environment variables consulted for an auth token, in priority order
+_TOKEN_ENV_VARS = ('JUPYTERHUB_API_TOKEN', 'JPY_API_TOKEN', 'JUPYTER_TOKEN')
+
+# Values accepted by --type
+_NOTIFICATION_TYPES = ("default", "info", "success", "warning", "error", "in-progress")
+
+# Action button attached by the CLI. A tuple so the one shared instance
+# cannot be mutated; it serializes to a JSON array like a list.
+_DEFAULT_ACTIONS = (
+    {
+        "label": "Dismiss",
+        "caption": "Close this notification",
+        "displayType": "default"
+    },
+)
+
 
 def send_notification(
     base_url: str = "http://localhost:8888",
@@ -34,7 +69,9 @@ def send_notification(
     actions: list = None,
     data: dict = None,
     token: str = None,
-    verbose: bool = False
+    verbose: bool = False,
+    immediate: bool = False,
+    return_result: bool = True
 ):
     """
     Send a notification to the JupyterLab notification extension.
@@ -46,36 +83,166 @@ def send_notification(
         auto_close: Auto-close timeout in milliseconds, or False to disable
         actions: List of action dictionaries with label, caption, and displayType
         data: Optional arbitrary data to attach to the notification
-        token: Authentication token (optional for localhost, automatically detected from environment if not provided)
+        token: Authentication token (read from the environment if not provided)
+        verbose: Print debug information
+        immediate: Push instantly to connected clients via WebSocket
+        return_result: Decode and return the server response; pass False
+            for fire-and-forget sends (returns None, errors still raise)
     """
+    payload = _build_payload(
+        message, notification_type, auto_close, actions, data, immediate
+    )
+    result = _post(base_url, token, payload, verbose, return_result)
+    print("✓ Notification sent successfully!")
+    if result is not None:
+        print(f"  Notification ID: {result.get('notification_id')}")
+    return result
 
-    # Check if target is localhost
-    is_localhost = base_url.startswith('http://localhost') or base_url.startswith('http://127.0.0.1') or base_url.startswith('http://[::1]')
 
-    # Auto-detect token from environment variables if not provided (skip for localhost)
-    if not is_localhost and token is None:
-        token = (os.environ.get('JUPYTERHUB_API_TOKEN') or
-                 os.environ.get('JPY_API_TOKEN') or
-                 os.environ.get('JUPYTER_TOKEN'))
+def send_notifications_batch(
+    items: list,
+    base_url: str = "http://localhost:8888",
+    token: str = None,
+    verbose: bool = False,
+    return_result: bool = True
+):
+    """
+    Send several notifications to the JupyterLab notification extension in
+    one HTTP request.
 
-    if verbose:
-        if is_localhost:
-            print(f"Target is localhost - skipping authentication")
-        elif token:
-            print(f"Using authentication token")
-        else:
-            print(f"No token provided for remote host")
-        print()
+    The ingest endpoint accepts a JSON array, so N notifications cost a
+    single round-trip instead of N.
+
+    Args:
+        items: List of dicts with the keyword arguments of send_notification
+            (message, notification_type, auto_close, actions, data, immediate)
+        base_url: Base URL of the JupyterLab server (default: http://localhost:8888)
+        token: Authentication token (auto-detected as for send_notification)
+        return_result: As for send_notification
+
+    Returns:
+        Server response; notification_ids are in the same order as items
+    """
+    payloads = [_build_payload(**item) for item in items]
+    result = _post(base_url, token, payloads, verbose, return_result)
+    print(f"✓ {len(payloads)} notification(s) sent successfully!")
+    return result
+
+
+async def send_notification_async(
+    base_url: str = "http://localhost:8888",
+    message: str = "Hello from notification script!",
+    notification_type: str = "info",
+    auto_close: int = 5000,
+    actions: list = None,
+    data: dict = None,
+    token: str = None,
+    verbose: bool = False,
+    immediate: bool = False,
+    return_result: bool = True
+):
+    """
+    Awaitable form of send_notification for code running in an event loop.
+
+    The request runs in the loop's default executor, so the loop is not
+    blocked while it waits on the network. Arguments and return value match
+    send_notification.
+    """
+    import asyncio  # only async callers should pay for the import
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        None,
+        functools.partial(
+            send_notification,
+            base_url=base_url,
+            message=message,
+            notification_type=notification_type,
+            auto_close=auto_close,
+            actions=actions,
+            data=data,
+            token=token,
+            immediate=immediate,
+            verbose=verbose,
+            return_result=return_result
+        )
+    )
+
+
+async def send_many(items: list, concurrency: int = 32):
+    """
+    Send notifications concurrently, e.g. to several servers or users.
+
+    Wall-clock time approaches the slowest single request rather than the
+    sum of all of them. For many notifications to one server prefer
+    send_notifications_batch, which needs only one request.
+
+    Args:
+        items: List of dicts with the keyword arguments of send_notification
+            (each may name its own base_url and token)
+        concurrency: Maximum number of requests in flight at once
+
+    Returns:
+        List of server responses in the same order as items
+    """
+    import asyncio
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send_one(item):
+        async with semaphore:
+            return await send_notification_async(**item)
 
-    # Construct the endpoint URL
+    return await asyncio.gather(*(send_one(item) for item in items))
+
+
+@functools.lru_cache(maxsize=1)
+def _env_token():
+    """First non-empty token from _TOKEN_ENV_VARS, read once per process."""
+    return next(
+        (os.environ[name] for name in _TOKEN_ENV_VARS if os.environ.get(name)),
+        None
+    )
+
+
+def reset_token_cache():
+    """Re-read the token environment variables on the next lookup.
+
+    The env token is resolved once per process; call this after changing
+    os.environ (e.g. in tests) to pick up the new value.
+    """
+    _env_token.cache_clear()
+
+
+@functools.lru_cache(maxsize=8)
+def _prepare(base_url, token):
+    """
+    Ingest endpoint and request headers for a server, built once per
+    (base_url, token). The headers dict is shared and must not be mutated.
+    """
+    # The token travels in the Authorization header only, never in the URL,
+    # so it does not land in server access logs.
     endpoint = f"{base_url}/jupyterlab-notifications-extension/ingest"
 
-    # Add token to URL if available and not localhost
-    if token and not is_localhost:
-        separator = '&' if '?' in endpoint else '?'
-        endpoint = f"{endpoint}{separator}token={token}"
+    headers = {
+        'Content-Type': 'application/json'
+    }
+
+    if token:
+        headers['Authorization'] = f'token {token}'
 
-    # Build notification payload
+    return endpoint, headers
+
+
+def _build_payload(
+    message: str,
+    notification_type: str = "info",
+    auto_close: int = 5000,
+    actions: list = None,
+    data: dict = None,
+    immediate: bool = False
+):
+    """Build the ingest payload for one notification (optional keys omitted)."""
     payload = {
         "message": message,
         "type": notification_type,
@@ -88,38 +255,44 @@ def send_notification(
     if data is not None:
         payload["data"] = data
 
-    # Convert to JSON
-    data = json.dumps(payload).encode('utf-8')
+    if immediate:
+        payload["immediate"] = True
 
-    # Debug: print JSON body if verbose mode enabled
-    if verbose:
-        print(f"Sending JSON payload:")
-        print(json.dumps(payload, indent=2))
-        print()
+    return payload
 
-    # Build headers
-    headers = {
-        'Content-Type': 'application/json'
-    }
 
-    # Add authorization header if token is available and not localhost
-    if token and not is_localhost:
-        headers['Authorization'] = f'token {token}'
+def _post(base_url, token, body, verbose, return_result):
+    """
+    POST a payload (dict or list) to the ingest endpoint.
+
+    Returns the decoded server response, or None when return_result is
+    False. urlopen honours HTTP(S)_PROXY / NO_PROXY.
+    """
+    import urllib.request  # deferred with the first send
+
+    if token is None:
+        token = _env_token()
+
+    if verbose:
+        print(f"Using base URL: {base_url}")
+        print("Using authentication token" if token else "No authentication token")
+        print("Sending JSON payload:")
+        print(json.dumps(body, indent=2))
+        print()
 
-    # Create request
+    endpoint, headers = _prepare(base_url, token)
     req = urllib.request.Request(
         endpoint,
-        data=data,
+        data=_dumps(body),
         headers=headers,
         method='POST'
     )
 
     try:
         with urllib.request.urlopen(req) as response:
-            result = json.loads(response.read().decode('utf-8'))
-            print(f"✓ Notification sent successfully!")
-            print(f"  Notification ID: {result.get('notification_id')}")
-            return result
+            if not return_result:
+                return None
+            return json.loads(response.read())
     except urllib.error.HTTPError as e:
         error_body = e.read().decode('utf-8')
         print(f"✗ HTTP Error {e.code}: {e.reason}")
@@ -131,7 +304,11 @@ def send_notification(
         raise
 
 
-def main():
+@functools.lru_cache(maxsize=1)
+def _build_parser():
+    """Command-line parser, built once per process (main() may run repeatedly)."""
+    import argparse  # CLI only; library callers of send_notification skip it
+
     parser = argparse.ArgumentParser(
         description="Send notifications to JupyterLab notification extension",
         epilog="""
@@ -159,7 +336,7 @@ Examples:
     )
     parser.add_argument(
         "--type",
-        choices=["default", "info", "success", "warning", "error", "in-progress"],
+        choices=_NOTIFICATION_TYPES,
         default="info",
         help="Notification type (default: info)"
     )
@@ -177,7 +354,7 @@ Examples:
     parser.add_argument(
         "--token",
         default=None,
-        help="Authentication token (optional for localhost; auto-detected from JUPYTERHUB_API_TOKEN or JUPYTER_TOKEN env vars if not provided)"
+        help="Authentication token (read from JUPYTERHUB_API_TOKEN, JPY_API_TOKEN or JUPYTER_TOKEN env vars if not provided)"
     )
     parser.add_argument(
         "--verbose",
@@ -190,8 +367,11 @@ Examples:
         default=None,
         help="JSON string of arbitrary data to attach to notification (e.g., '{\"url\": \"https://example.com\"}')"
     )
+    return parser
 
-    args = parser.parse_args()
+
+def main():
+    args = _build_parser().parse_args()
 
     auto_close = False if args.no_auto_close else args.auto_close
 
@@ -201,24 +381,15 @@ Examples:
         try:
             data_dict = json.loads(args.data)
         except json.JSONDecodeError as e:
-            print(f"✗ Error parsing --data JSON: {e}")
+            print(f"Error parsing --data JSON: {e}")
             return
 
-    # Example with action buttons
-    actions = [
-        {
-            "label": "Dismiss",
-            "caption": "Close this notification",
-            "displayType": "default"
-        }
-    ]
-
     send_notification(
         base_url=args.url,
         message=args.message,
         notification_type=args.type,
         auto_close=auto_close,
-        actions=actions,
+        actions=_DEFAULT_ACTIONS,
         data=data_dict,
         token=args.token,
         verbose=args.verbose